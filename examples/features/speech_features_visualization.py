@@ -8,23 +8,41 @@ for feat in ('bnf', 'mspec', 'spec', 'mfcc'):
   if feat not in ds:
     continue
   from sklearn.manifold import TSNE
-  X = []; y = []
   # get right feat and indices
   feat_pca = ds.find_prefix(feat, 'pca')
-  indices = ds.find_prefix(feat, 'indices')
-  # transform
+  # utterances without any frame have no mean, they are skipped (they
+  # would also break the segment sums of `np.add.reduceat` below)
+  indices = [(f, (start, end))
+             for f, (start, end) in ds.find_prefix(feat, 'indices')
+             if len(f.split('_')[-1]) == 1 and end > start]
+  # the PCA is an affine transform, hence, mean of the transformed frames
+  # equal to the transform of the mean frame, average each utterance first
+  # directly into pre-allocated rows, then transform all of them at once
+  X = np.empty(shape=(len(indices), ds[feat].shape[-1]), dtype='float64')
+  y = np.asarray([f.split('_')[-1] for f, _ in indices])
+  # visit the utterances in order of their offset, so the memmap is
+  # scanned once, adjacent utterances are read as a single block
+  order = sorted(range(len(indices)), key=lambda i: indices[i][1][0])
+  runs = []
+  for i in order:
+    start, end = indices[i][1]
+    if len(runs) > 0 and \
+    indices[runs[-1][-1]][1][1] == start and \
+    end - indices[runs[-1][0]][1][0] <= 120000:
+      runs[-1].append(i)
+    else:
+      runs.append([i])
   prog = Progbar(target=len(indices),
                  print_summary=True, print_report=True,
                  name="PCA transform: %s" % feat)
-  for f, (start, end) in indices:
-    if len(f.split('_')[-1]) == 1:
-      X.append(np.mean(
-          feat_pca.transform(ds[feat][start:end]),
-          axis=0, keepdims=True))
-      y.append(f.split('_')[-1])
-    prog.add(1)
-  X_pca = np.concatenate(X, axis=0)
-  y = np.asarray(y)
+  for rows in runs:
+    starts = np.array([indices[i][1][0] for i in rows])
+    ends = np.array([indices[i][1][1] for i in rows])
+    block = np.asarray(ds[feat][starts[0]:ends[-1]], dtype='float64')
+    X[rows] = np.add.reduceat(block, starts - starts[0], axis=0) / \
+        (ends - starts)[:, np.newaxis]
+    prog.add(len(rows))
+  X_pca = feat_pca.transform(X)
   with UnitTimer(name="TSNE: feat='%s' N=%d" % (feat, X_pca.shape[0])):
     X_tsne = TSNE(n_components=2).fit_transform(X_pca)
   colors = V.generate_random_colors(len(labels), seed=1234)
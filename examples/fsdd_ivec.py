@@ -64,11 +64,11 @@ NMIX = args.nmix
 GMM_NITER = 12
 GMM_DOWNSAMPLE = 1
 GMM_STOCHASTIC = True
-GMM_DTYPE = 'float64'
+GMM_DTYPE = 'float32'
 # ====== IVEC training ====== #
 TV_DIM = args.tdim
 TV_NITER = 16
-TV_DTYPE = 'float64'
+TV_DTYPE = 'float32'
 # ===========================================================================
 # Extract acoustic features
 # ===========================================================================
@@ -156,28 +156,28 @@ L_PATH = ( # labels
 # ===========================================================================
 # Helper
 # ===========================================================================
-# jackson speaker for testing, all other speaker for training
-def is_train(x):
-  return x.split('_')[1] != 'jackson'
-
 def extract_digit(x):
   return x.split('_')[0]
 
 fn_extract = extract_digit
-fn_label, labels = unique_labels([i[0] for i in indices],
-                                 key_func=fn_extract,
-                                 return_labels=True)
+_, labels = unique_labels([i[0] for i in indices],
+                         key_func=fn_extract,
+                         return_labels=True)
 print("Labels:", ctext(labels, 'cyan'))
 # ===========================================================================
 # Preparing data
 # ===========================================================================
-train_files = [] # (name, (start, end)) ...
-test_files = []
-for name, (start, end) in indices:
-  if is_train(name):
-    train_files.append((name, (start, end)))
-  else:
-    test_files.append((name, (start, end)))
+# split all the names once: "digit_speaker_index" => digit, speaker
+utt_names = np.array([name for name, _ in indices])
+utt_digits, _, utt_rest = np.char.partition(utt_names, '_').T
+utt_speakers = np.char.partition(utt_rest, '_')[:, 0]
+# integer label of every utterance, `labels` are sorted by `unique_labels`
+utt_label_ids = np.searchsorted(np.array(labels), utt_digits)
+utt_order = np.argsort(utt_names)
+# jackson speaker for testing, all other speaker for training
+train_mask = utt_speakers != 'jackson'
+train_files = [indices[i] for i in np.flatnonzero(train_mask)] # (name, (start, end)) ...
+test_files = [indices[i] for i in np.flatnonzero(~train_mask)]
 # name for each dataset, useful for later
 data_name = ['train', 'test']
 print("#Train:", len(train_files))
@@ -217,7 +217,9 @@ for name, files, z_path, f_path, l_path in zip(
                           dtype='float32', device='cpu', ncpu=None,
                           override=True)
   # load the statistics in MmapData
-  y_true[name] = [fn_label(i) for i in np.genfromtxt(fname=l_path, dtype=str)]
+  l_names = np.genfromtxt(fname=l_path, dtype=str)
+  y_true[name] = utt_label_ids[
+      utt_order[np.searchsorted(utt_names[utt_order], l_names)]]
   stats[name] = (F.MmapData(path=z_path, read_only=True),
                  F.MmapData(path=f_path, read_only=True))
 for name, x in stats.items():
@@ -1,11 +1,12 @@
 import argparse
 import glob
 import itertools
+import json
+import multiprocessing
 import os
 import pickle
 import shutil
-from collections import defaultdict
-from typing import Optional
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
@@ -40,6 +41,8 @@ BETA = [0.001, 0.005, 0.01, 0.1, 0.5, 1., 2.5, 5., 10]
 GAMMA = [0.001, 0.005, 0.01, 0.1, 0.5, 1., 2.5, 5., 10]
 ZDIM = [2, 5, 10, 20, 35, 60, 80]
 OVERWRITE = False
+# XLA auto-clustering for training, inputs are fixed-shape MNIST batches
+JIT = True
 
 
 def networks(zdim):
@@ -87,17 +90,58 @@ def get_cache_path(suffix: str = '') -> str:
   return path
 
 
-def load_vae_eval(job: Job):
+def pin_gpu():
+  """Pin the current MPI worker to a single GPU (round-robin on the worker
+  identity), the MPI workers are persistent so this only takes effect for
+  the first job, before the TF runtime initialized the devices."""
+  gpus = tf.config.list_physical_devices('GPU')
+  if len(gpus) == 0:
+    return
+  rank = (multiprocessing.current_process()._identity or (0,))[0]
+  gpu = gpus[rank % len(gpus)]
+  try:
+    tf.config.set_visible_devices(gpu, 'GPU')
+    tf.config.experimental.set_memory_growth(gpu, True)
+  except RuntimeError:  # devices already initialized
+    pass
+
+
+def has_weights(job: Job) -> bool:
+  """Check for the saved checkpoint before doing any TF work"""
+  return os.path.exists(f'{get_path(job)}.index')
+
+
+def create_vae_eval(zdim: int, beta: float = 1.0, gamma: float = 1.0):
+  pin_gpu()
   np.random.seed(1)
   tf.random.set_seed(1)
-  path = get_path(job)
   ds = MNIST()
-  vae = BetaGammaVAE(beta=job.beta, gamma=job.gamma, **networks(job.zdim))
+  vae = BetaGammaVAE(beta=beta, gamma=gamma, **networks(zdim))
   vae.build(ds.full_shape)
   vae.trainable = False
+  return ds, vae
+
+
+def load_weights_eval(vae: BetaGammaVAE, job: Job) -> bool:
   try:
-    vae.load_weights(path, verbose=False, raise_notfound=True)
+    vae.load_weights(get_path(job), verbose=False, raise_notfound=True)
   except FileNotFoundError:
+    return False
+  return True
+
+
+def read_results(path: str) -> List[dict]:
+  if not os.path.exists(path):
+    return []
+  with open(path, 'r') as f:
+    return [json.loads(line) for line in f if len(line.strip()) > 0]
+
+
+def load_vae_eval(job: Job):
+  if not has_weights(job):
+    return None, None
+  ds, vae = create_vae_eval(job.zdim, beta=job.beta, gamma=job.gamma)
+  if not load_weights_eval(vae, job):
     return None, None
   return ds, vae
 
@@ -106,6 +150,7 @@ def load_vae_eval(job: Job):
 # Main
 # ===========================================================================
 def training(job: Job):
+  pin_gpu()
   np.random.seed(1)
   tf.random.set_seed(1)
   path = get_path(job)
@@ -121,8 +166,9 @@ def training(job: Job):
   elif len(exist_files) > 1:
     print('Skip training:', job)
     return
+  tf.config.optimizer.set_jit(JIT)
   ds = MNIST()
-  train = ds.create_dataset('train', batch_size=32)
+  train = ds.create_dataset('train', batch_size=32, drop_remainder=True)
   vae = BetaGammaVAE(beta=job.beta, gamma=job.gamma, **networks(job.zdim))
   vae.build(ds.full_shape)
   vae.fit(train, learning_rate=1e-3, max_iter=80000, logdir=path,
@@ -148,17 +194,17 @@ def evaluate_reconstruction(job: Job):
   reconstruction = x
   ## sample prior
   test = ds.create_dataset('test', label_percent=1.0, batch_size=32)
-  z_map = defaultdict(list)
+  # per-class sum and count of the latent means, written in place
+  n_labels = len(ds.labels)
+  z_sum = np.zeros((n_labels, job.zdim), dtype=np.float64)
+  z_count = np.zeros((n_labels,), dtype=np.int64)
   for x, y in test.take(20):
     y = np.argmax(y, axis=-1)
     px, qz = vae(x, training=False)
-    z = qz.mean().numpy()
-    for i, j in zip(y, z):
-      z_map[i].append(j[np.newaxis, :])
-  z_map = {k: np.mean(np.concatenate(v, 0), 0)
-           for k, v in z_map.items()}
+    np.add.at(z_sum, y, qz.mean().numpy())
+    z_count += np.bincount(y, minlength=n_labels)
   samples = vae.sample_observation(n=100).mean()
-  ref = z_map[8]  # number 8
+  ref = z_sum[8] / z_count[8]  # number 8
   distances = [np.linalg.norm(x - ref, 2)
                for x in vae.encode(samples).mean().numpy()]
   samples = np.squeeze(np.clip(samples[np.argmin(distances)], 0.0, 1.0), -1)
@@ -168,33 +214,57 @@ def evaluate_reconstruction(job: Job):
               sample=samples)
 
 
-def evaluate_balance(job: Job):
-  ds, vae = load_vae_eval(job)
-  if vae is None:
+def evaluate_balance(jobs: List[Job]):
+  """Evaluate all jobs with the same `zdim`, the model and the (cached) test
+  dataset are created once, only the weights are swapped between jobs"""
+  assert len(set(j.zdim for j in jobs)) == 1, \
+    f'All jobs must have the same zdim, given: {jobs}'
+  jobs = [j for j in jobs if has_weights(j)]
+  if len(jobs) == 0:
     return
+  ds, vae = create_vae_eval(jobs[0].zdim)
   test = ds.create_dataset('test', batch_size=64)
-  llk = []
-  kl = []
-  mean = []
-  stddev = []
-  for x in test:
+
+  # sums and counts are accumulated on device, only the totals are copied
+  # back to host at the end
+  @tf.function(experimental_relax_shapes=True)
+  def accumulate(x):
     px_z, qz_x = vae(x, training=False)
-    llk.append(px_z.log_prob(x))
-    kl.append(qz_x.KL_divergence(analytic=False))
-    mean.append(qz_x.mean().numpy())
-    stddev.append(qz_x.stddev().numpy())
-  llk = np.mean(np.concatenate(llk, 0))
-  kl = np.mean(np.concatenate(kl, 0))
-  mean = np.mean(np.concatenate(mean, 0), 0)
-  stddev = np.mean(np.concatenate(stddev, 0), 0)
-  # active units
-  threshold = 0.1  # this threhold to be checked again
-  au_mean = len(mean) - np.sum(np.abs(mean) <= threshold)
-  au_std = len(stddev) - np.sum(np.abs(stddev - 1.0) <= threshold)
-  print(sorted(stddev), job.zdim, au_std)
-  return dict(beta=job.beta, gamma=job.gamma, zdim=job.zdim,
-              llk=llk, kl=kl,
-              au_mean=au_mean, au_std=au_std)
+    llk = px_z.log_prob(x)
+    kl = qz_x.KL_divergence(analytic=False)
+    mean = qz_x.mean()
+    stddev = qz_x.stddev()
+    return (tf.reduce_sum(llk), tf.cast(tf.size(llk), llk.dtype),
+            tf.reduce_sum(kl), tf.cast(tf.size(kl), kl.dtype),
+            tf.reduce_sum(mean, 0), tf.reduce_sum(stddev, 0),
+            tf.cast(tf.shape(mean)[0], mean.dtype))
+
+  for job in jobs:
+    if not load_weights_eval(vae, job):
+      continue
+    totals = None
+    for x in test:
+      outputs = accumulate(x)
+      if totals is None:
+        totals = outputs
+      else:
+        totals = [i + j for i, j in zip(totals, outputs)]
+    llk_sum, llk_n, kl_sum, kl_n, mean_sum, stddev_sum, n = totals
+    llk = (llk_sum / llk_n).numpy()
+    kl = (kl_sum / kl_n).numpy()
+    mean = mean_sum / n
+    stddev = stddev_sum / n
+    # active units, counted on device
+    threshold = 0.1  # this threhold to be checked again
+    n_units = tf.size(mean)
+    au_mean = (n_units - tf.reduce_sum(
+      tf.cast(tf.abs(mean) <= threshold, tf.int32))).numpy()
+    au_std = (n_units - tf.reduce_sum(
+      tf.cast(tf.abs(stddev - 1.0) <= threshold, tf.int32))).numpy()
+    print(sorted(stddev.numpy()), job.zdim, au_std)
+    yield dict(beta=job.beta, gamma=job.gamma, zdim=job.zdim,
+               llk=llk, kl=kl,
+               au_mean=au_mean, au_std=au_std)
 
 
 # ===========================================================================
@@ -249,6 +319,7 @@ if __name__ == '__main__':
   parser.add_argument('mode', type=int)
   parser.add_argument('-ncpu', type=int, default=1)
   parser.add_argument('--overwrite', action='store_true')
+  parser.add_argument('--no-jit', action='store_true')
   parser.add_argument('--no-anno', action='store_true')
   # === 1. prepare
   args = parser.parse_args()
@@ -258,6 +329,7 @@ if __name__ == '__main__':
   jobs = [Job(beta=b, gamma=g, zdim=z)
           for b, g, z in itertools.product(BETA, GAMMA, ZDIM)]
   OVERWRITE = args.overwrite
+  JIT = not args.no_jit
   # === 2. training
   if args.mode == 0:
     for _ in MPI(jobs, training, ncpu=ncpu):
@@ -287,48 +359,47 @@ if __name__ == '__main__':
                 show_reconstruction=False)
   # === 4. evaluating ELBO balancing
   elif args.mode == 1:
-    path = get_cache_path()
-    # get evaluating results
-    if os.path.exists(path):
-      with open(path, 'rb') as f:
-        df = pickle.load(f)
-    else:
-      df = []
-      progress = tqdm(total=len(jobs), desc='Evaluating Balance')
-      for results in MPI(jobs, evaluate_balance, ncpu=ncpu):
-        progress.update(1)
-        if results is None:
-          continue
-        df.append(results)
+    # results are appended as soon as they are ready, a restarted run
+    # only evaluates the jobs that are not in the file yet
+    path = get_cache_path(suffix='.jsonl')
+    df = read_results(path)
+    done = set((r['beta'], r['gamma'], r['zdim']) for r in df)
+    remain = [j for j in jobs if (j.beta, j.gamma, j.zdim) not in done]
+    if len(remain) > 0:
+      progress = tqdm(total=len(remain), desc='Evaluating Balance')
+      # one task per zdim, all (beta, gamma) share the same model
+      zdim_jobs = [[j for j in remain if j.zdim == z] for z in ZDIM]
+      zdim_jobs = [j for j in zdim_jobs if len(j) > 0]
+      with open(path, 'a') as f:
+        for results in MPI(zdim_jobs, evaluate_balance, ncpu=ncpu):
+          progress.update(1)
+          results = {k: v.item() if hasattr(v, 'item') else v
+                     for k, v in results.items()}
+          f.write(json.dumps(results) + '\n')
+          f.flush()
+          df.append(results)
       progress.close()
-      df = pd.DataFrame(df)
-      with open(path, 'wb') as f:
-        pickle.dump(df, f)
+    df = pd.DataFrame(df)
     # add elbo
     df['elbo'] = df['llk'] - df['kl']
-    # plotting: fix zdim, show llk and kl
+    # plotting, fix zdim and show:
+    #  - llk and kl
+    #  - au and llk
+    #  - au and elbo
     n_cols = 4
     n_rows = int(np.ceil(len(ZDIM) / n_cols))
-    plt.figure(figsize=(n_cols * 6, n_rows * 5), dpi=200)
-    for i, (zdim, group) in tqdm(enumerate(df.groupby('zdim'))):
-      ax = plt.subplot(n_rows, n_cols, i + 1)
-      plot(group, x='beta', y='gamma', hue='llk', size='kl',
-           title=f'zdim={zdim}', ax=ax)
-    plt.tight_layout()
-    # fix zdim, show au and llk
-    plt.figure(figsize=(n_cols * 6, n_rows * 5), dpi=200)
-    for i, (zdim, group) in tqdm(enumerate(df.groupby('zdim'))):
-      ax = plt.subplot(n_rows, n_cols, i + 1)
-      plot(group, x='beta', y='gamma', hue='llk', size='au_std',
-           title=f'zdim={zdim}', ax=ax)
-    plt.tight_layout()
-    # fix zdim, show au and elbo
-    plt.figure(figsize=(n_cols * 6, n_rows * 5), dpi=200)
+    figures = [(plt.figure(figsize=(n_cols * 6, n_rows * 5), dpi=200),
+                hue, size)
+               for hue, size in [('llk', 'kl'), ('llk', 'au_std'),
+                                 ('elbo', 'au_std')]]
     for i, (zdim, group) in tqdm(enumerate(df.groupby('zdim'))):
-      ax = plt.subplot(n_rows, n_cols, i + 1)
-      plot(group, x='beta', y='gamma', hue='elbo', size='au_std',
-           title=f'zdim={zdim}', ax=ax)
-    plt.tight_layout()
+      for fig, hue, size in figures:
+        plt.figure(fig.number)
+        ax = fig.add_subplot(n_rows, n_cols, i + 1)
+        plot(group, x='beta', y='gamma', hue=hue, size=size,
+             title=f'zdim={zdim}', ax=ax)
+    for fig, _, _ in figures:
+      fig.tight_layout()
     # save all figures
     vs.plot_save(os.path.join(save_path, 'rate_distortion.pdf'), verbose=True)
     # save score file
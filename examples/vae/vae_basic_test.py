@@ -218,10 +218,16 @@ def main(cfg: dict):
     z = fast_umap(qz.mean().numpy())
     vs.plot_scatter(z, color=y, size=12.0, alpha=0.4)
     img_umap = vs.plot_to_image(fig)
-    # gradients
-    grads = [(k, v) for k, v in trainer.last_train_metrics.items() if '_grad/' in k]
-    encoder_grad = sum(v for k, v in grads if 'Encoder' in k)
-    decoder_grad = sum(v for k, v in grads if 'Decoder' in k)
+    # gradients, grouped in a single pass over the metrics
+    encoder_grad = 0.
+    decoder_grad = 0.
+    for k, v in trainer.last_train_metrics.items():
+      if '_grad/' not in k:
+        continue
+      if 'Encoder' in k:
+        encoder_grad += v
+      elif 'Decoder' in k:
+        decoder_grad += v
     return dict(reconstruct=img_res,
                 umap=img_umap,
                 latents=img_qz,
@@ -1,9 +1,9 @@
-import collections
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Union, Sequence
 
 import numpy as np
 import tensorflow as tf
+from tensorflow.python.training.tracking import base as trackable
 from tensorflow_probability.python.distributions import Distribution
 from typing_extensions import Literal
 
@@ -28,37 +28,19 @@ def _split_if_tensor(x):
   return x1, x2
 
 
+def _split_structure(structure):
+  """ Split every tensor in a nested structure into 2 halves along the first
+  axis, non-tensor values are repeated in both """
+  flat = [_split_if_tensor(x) for x in tf.nest.flatten(structure)]
+  return (tf.nest.pack_sequence_as(structure, [x[0] for x in flat]),
+          tf.nest.pack_sequence_as(structure, [x[1] for x in flat]))
+
+
 def _split_inputs(inputs, mask, call_kw):
   """ Split the data into 2 partitions for training the VAE and Discriminator"""
-  # split inputs into 2 mini-batches here
-  if tf.is_tensor(inputs):
-    x1, x2 = tf.split(inputs, 2, axis=0)
-  else:
-    inputs = [tf.split(x, 2, axis=0) for x in tf.nest.flatten(inputs)]
-    x1 = [i[0] for i in inputs]
-    x2 = [i[1] for i in inputs]
-  # split the mask
-  mask1 = None
-  mask2 = None
-  if mask is not None:
-    if tf.is_tensor(mask):
-      mask1, mask2 = tf.split(mask, 2, axis=0)
-    else:
-      mask = [tf.split(m, 2, axis=0) for m in tf.nest.flatten(mask)]
-      mask1 = [i[0] for i in mask]
-      mask2 = [i[1] for i in mask]
-  # split the call_kw
-  call_kw1 = {}
-  call_kw2 = {}
-  for k, v in call_kw.items():
-    if isinstance(v, collections.Sequence):
-      v = [_split_if_tensor(i) for i in v]
-      call_kw1[k] = [i[0] for i in v]
-      call_kw2[k] = [i[1] for i in v]
-    else:
-      v1, v2 = _split_if_tensor(v)
-      call_kw1[k] = v1
-      call_kw2[k] = v2
+  x1, x2 = _split_structure(inputs)
+  mask1, mask2 = _split_structure(mask)
+  call_kw1, call_kw2 = _split_structure(call_kw)
   return (x1, mask1, call_kw1), (x2, mask2, call_kw2)
 
 
@@ -160,9 +142,13 @@ class FactorVAE(AnnealingVAE):
     labels = kwargs.pop(
       'labels', RVconf(1, 'bernoulli', projection=True, name="discriminator"))
     super().__init__(name=name, **kwargs)
-    self.tc_coef = tf.convert_to_tensor(tc_coef,
-                                        dtype=self.dtype,
-                                        name='tc_coef')
+    # non-trainable variable, so the coefficient could be re-assigned without
+    # retracing the compiled functions, and it isn't stored in the checkpoint
+    with trackable.no_automatic_dependency_tracking_scope(self):
+      self.tc_coef = tf.Variable(tc_coef,
+                                 trainable=False,
+                                 dtype=self.dtype,
+                                 name='tc_coef')
     ## init discriminator
     self.discriminator = FactorDiscriminator(
       units=as_tuple(discriminator_units),
@@ -185,7 +171,8 @@ class FactorVAE(AnnealingVAE):
 
   def build(self, input_shape=None) -> 'FactorVAE':
     super().build(input_shape)
-    zdim = int(sum(np.prod(z.event_shape) for z in as_tuple(self.latents)))
+    zdim = int(sum(np.prod(z.event_shape)
+                   for z in as_tuple(self._factor_posteriors(self.latents))))
     self.discriminator.build((None, zdim))
     # split the parameters
     self.disc_params = self.discriminator.trainable_variables
@@ -221,18 +208,25 @@ class FactorVAE(AnnealingVAE):
     kl['tc'] = tc
     return llk, kl
 
+  def _factor_posteriors(self, qz_x):
+    """Select the posteriors (or latents layers, in the same order) that are
+    fed to the factor discriminator, by default all latents"""
+    return qz_x
+
   def total_correlation(self,
                         qz_x: Distribution,
                         training: Optional[bool] = None) -> tf.Tensor:
     return self.tc_coef * self.discriminator.total_correlation(
-      qz_x, training=training)
+      self._factor_posteriors(qz_x), training=training)
 
   def dtc_loss(self,
                qz_x: Distribution,
                qz_xprime: Optional[Distribution] = None,
                training: Optional[bool] = None) -> tf.Tensor:
     """ Discrimination loss between real and permuted codes Algorithm (2) """
-    return self.discriminator.dtc_loss(qz_x,
+    if qz_xprime is not None:
+      qz_xprime = self._factor_posteriors(qz_xprime)
+    return self.discriminator.dtc_loss(self._factor_posteriors(qz_x),
                                        qz_xprime=qz_xprime,
                                        training=training)
 
@@ -321,7 +315,15 @@ class SemiFactorVAE(FactorVAE):
                      name=name,
                      **kwargs)
     self.n_labels = self.discriminator.n_outputs
-    self.alpha = tf.convert_to_tensor(alpha, dtype=self.dtype, name='alpha')
+    with trackable.no_automatic_dependency_tracking_scope(self):
+      self.alpha = tf.Variable(alpha,
+                               trainable=False,
+                               dtype=self.dtype,
+                               name='alpha')
+    # resolved once, the posterior is fed directly if the discriminator
+    # doesn't convert it into samples
+    self._to_samples = getattr(self.discriminator, '_to_samples',
+                               lambda qz_x: qz_x)
 
   def encode(self, inputs, training=None, mask=None, **kwargs):
     X, y, mask = prepare_ssl_inputs(inputs, mask=mask, n_unsupervised_inputs=1)
@@ -330,12 +332,8 @@ class SemiFactorVAE(FactorVAE):
   def classify(self,
                inputs: Union[TensorType, List[TensorType]],
                training: Optional[bool] = None) -> Distribution:
-    qz_x = self.encode(inputs, training=training)
-    if hasattr(self.discriminator, '_to_samples'):
-      z = self.discriminator._to_samples(qz_x)
-    else:
-      z = qz_x
-    y = self.discriminator(z, training=training)
+    qz_x = self._factor_posteriors(self.encode(inputs, training=training))
+    y = self.discriminator(self._to_samples(qz_x), training=training)
     assert isinstance(y, Distribution), \
       f"Discriminator must return a Distribution, but returned: {y}"
     return y
@@ -349,7 +347,10 @@ class SemiFactorVAE(FactorVAE):
     labelled examples (i.e. `mask=1`), and otherwise, unlabelled examples.
     """
     return self.alpha * self.discriminator.supervised_loss(
-      labels=labels, qz_x=qz_x, mask=mask, training=training)
+      labels=labels,
+      qz_x=self._factor_posteriors(qz_x),
+      mask=mask,
+      training=training)
 
   @classmethod
   def is_semi_supervised(self) -> bool:
@@ -378,25 +379,13 @@ class Factor2VAE(FactorVAE):
       "factors must be instance of RVmeta, but given: %s" % \
       str(type(factors))
     latents.append(factors)
-    super().__init__(latents=latents,
-                     latent_dim=int(np.prod(factors.event_shape)),
-                     **kwargs)
+    super().__init__(latents=latents, **kwargs)
     self.factors = factors
 
-  def _elbo(self, inputs, pX_Z, qz_x, mask, training):
-    llk, div = super(AnnealingVAE, self)._elbo(
-      inputs,
-      pX_Z,
-      qz_x,
-      mask=mask,
-      training=training,
-    )
-    # only use the assumed factors space for total correlation
-    tc = self.total_correlation(qz_x[-1], training=training)
-    if self.maximize_tc:
-      tc = -tc
-    div[f'tc_{self.factors.name}'] = tc
-    return llk, div
+  def _factor_posteriors(self, qz_x):
+    # only use the assumed factors space (the last latents) for the
+    # discriminator and the total correlation
+    return as_tuple(qz_x)[-1]
 
 
 class SemiFactor2VAE(SemiFactorVAE, Factor2VAE):
@@ -8,7 +8,6 @@ from odin.bay.vi.autoencoder.variational_autoencoder import (
 from odin.networks import SequentialNetwork
 from odin.utils import as_tuple
 from tensorflow.python import keras
-from tensorflow.python.eager import context
 from tensorflow.python.training.tracking import base as trackable
 
 
@@ -77,19 +76,19 @@ class ImplicitRankMinimizer(keras.layers.Layer):
   def call(self, inputs, training=None, **kwargs):
     for kernel in self.linear_weights:
       rank = inputs.shape.rank
-      if rank == 2 or rank is None:
-        if isinstance(inputs, tf.sparse.SparseTensor):
-          inputs = tf.sparse.sparse_dense_matmul(inputs, kernel)
-        else:
-          inputs = tf.matmul(inputs, kernel)
-      # Broadcast kernel to inputs.
+      if isinstance(inputs, tf.sparse.SparseTensor):
+        inputs = tf.sparse.sparse_dense_matmul(inputs, kernel)
+      elif rank == 2 or rank is None:
+        inputs = tf.matmul(inputs, kernel)
+      # flatten the leading dimensions into a single matmul, then reshape the
+      # output back to the original ndim of the input.
       else:
-        shape = inputs.shape.as_list()
-        inputs = tf.tensordot(inputs, kernel, [[rank - 1], [0]])
-        # Reshape the output back to the original ndim of the input.
-        if not context.executing_eagerly():
-          output_shape = shape[:-1] + [kernel.shape[-1]]
-          inputs.set_shape(output_shape)
+        static_shape = inputs.shape[:-1].concatenate(kernel.shape[-1:])
+        shape = tf.shape(inputs)
+        outputs = tf.matmul(tf.reshape(inputs, [-1, shape[-1]]), kernel)
+        inputs = tf.reshape(outputs,
+                            tf.concat([shape[:-1], tf.shape(kernel)[-1:]], 0))
+        inputs.set_shape(static_shape)
     return inputs
 
   def __str__(self):
@@ -390,10 +390,8 @@ def traverse_dims(
     raise ValueError(f'Unknown mode="mode"')
   ### traverse
   X = np.repeat(x, len(x_range), axis=0)
-  # repeat for each sample
-  for i in range(x.shape[0]):
-    s = i * len(x_range)
-    e = (i + 1) * len(x_range)
-    # note, this should be added not simple assignment
-    X[s:e, feature_indices] += x_range.astype(X.dtype)
+  # repeat the range for each sample, note, this should be added not
+  # simple assignment
+  X[:, feature_indices] += np.tile(
+    np.ravel(x_range).astype(X.dtype), x.shape[0])
   return X
@@ -6,18 +6,33 @@ from odin.backend.types_helpers import DataType, LabelType
 
 import numpy as np
 import tensorflow as tf
-from odin.fuel.dataset_base import IterableDataset, get_partition
+from odin.fuel.dataset_base import (IterableDataset, dataset_options,
+                                    get_partition)
 from odin.utils.crypto import md5_checksum
 from scipy import sparse
 
 
-def _tensor(x):
-  x = x.astype(np.float32)
+def _tensor(x, ids, block_size=1024):
+  r""" Stream the dense float32 rows `x[ids]`, the rows are read lazily from
+  `x` (dense, memory-mapped or sparse) by the input pipeline instead of
+  copying the whole partition into the graph. Each step reads a contiguous
+  block of `block_size` ids (densifying one CSR slice for sparse inputs) and
+  the blocks are unbatched into rows. """
   if isinstance(x, sparse.spmatrix):
-    x = tf.SparseTensor(indices=sorted(zip(*x.nonzero())),
-                        values=x.data,
-                        dense_shape=x.shape)
-  return tf.data.Dataset.from_tensor_slices(x)
+    x = x.tocsr()  # fast row slicing
+  ids = np.asarray(ids)
+
+  def gen():
+    for start in range(0, len(ids), block_size):
+      block = x[ids[start:start + block_size]]
+      if sparse.issparse(block):
+        block = block.toarray()
+      yield np.asarray(block, dtype=np.float32)
+
+  return tf.data.Dataset.from_generator(gen,
+                                        output_signature=tf.TensorSpec(
+                                            shape=(None, x.shape[1]),
+                                            dtype=tf.float32)).unbatch()
 
 
 class GeneDataset(IterableDataset):
@@ -99,11 +114,21 @@ class GeneDataset(IterableDataset):
     for attr in ('x', 'y', 'xvar', 'yvar'):
       assert hasattr(self, attr)
       assert getattr(self, attr) is not None
+    # reuse the pipeline built for the same arguments, it also keeps the
+    # filled in-memory cache across calls
+    if not hasattr(self, '_datasets'):
+      self._datasets = {}
+    key = (partition, batch_size, drop_remainder, shuffle, prefetch, cache,
+           parallel, label_percent, seed)
+    if key in self._datasets:
+      return self._datasets[key]
     # split train, valid, test data
     if not hasattr(self, 'train_ids') or self.train_ids is None:
       rand = np.random.RandomState(seed=1)
       n = self.x.shape[0]
       ids = rand.permutation(n)
+      if n <= np.iinfo(np.int32).max:
+        ids = ids.astype(np.int32)
       self.train_ids = ids[:int(0.85 * n)]
       self.valid_ids = ids[int(0.85 * n):int(0.9 * n)]
       self.test_ids = ids[int(0.9 * n):]
@@ -111,36 +136,36 @@ class GeneDataset(IterableDataset):
                         train=self.train_ids,
                         valid=self.valid_ids,
                         test=self.test_ids)
-    is_sparse_x = isinstance(self.x, sparse.spmatrix)
-    is_sparse_y = isinstance(self.y, sparse.spmatrix)
-    x = _tensor(self.x[ids])
-    y = _tensor(self.y[ids])
-    gen = tf.random.experimental.Generator.from_seed(seed=seed)
+    x = _tensor(self.x, ids)
+    y = _tensor(self.y, ids)
+    # semi-supervised mask, drawn once per example of the partition, so the
+    # same split always gives the same labelled examples
+    is_masked = bool(label_percent) and 0. < label_percent < 1.
 
     def _process(*data):
-      data = list(data)
-      if is_sparse_x:
-        data[0] = tf.sparse.to_dense(data[0])
-      if is_sparse_y and len(data) > 1:
-        data[1] = tf.sparse.to_dense(data[1])
-      data = tuple(data)
-      if label_percent:
-        if 0. < label_percent < 1.:  # semi-supervised mask
-          mask = gen.uniform(shape=(1,)) < label_percent
-          return dict(inputs=data, mask=mask)
+      if is_masked:
+        data, mask = data[:-1], data[-1]
+        return dict(inputs=data, mask=mask)
       return data[0] if len(data) == 1 else data
 
     ds = x
     if label_percent > 0.:
       ds = tf.data.Dataset.zip((x, y))
+    if is_masked:
+      mask = np.random.RandomState(seed).uniform(
+          size=(len(ids), 1)) < label_percent
+      ds = tf.data.Dataset.zip((x, y, tf.data.Dataset.from_tensor_slices(mask)))
     if cache is not None:
       ds = ds.cache(str(cache))
-    ds = ds.map(_process, parallel)
     # shuffle must be called after cache
     if shuffle is not None and shuffle > 0:
       ds = ds.shuffle(int(shuffle), seed=seed, reshuffle_each_iteration=True)
+    # process whole batches
     if batch_size is not None:
       ds = ds.batch(batch_size, drop_remainder)
+    ds = ds.map(_process, parallel)
     if prefetch is not None:
       ds = ds.prefetch(prefetch)
+    ds = ds.with_options(dataset_options())
+    self._datasets[key] = ds
     return ds
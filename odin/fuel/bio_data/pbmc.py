@@ -28,17 +28,40 @@ class PBMC(GeneDataset):
               'utf-8')
     name = os.path.basename(url)
     filename = os.path.join(path, name)
-    urlretrieve(url,
-                filename=filename,
-                reporthook=lambda blocknum, bs, size: None)
+    # download once, through a temporary file so an interrupted download
+    # is never mistaken for the dataset
+    if not os.path.exists(filename):
+      urlretrieve(url,
+                  filename=filename + '.tmp',
+                  reporthook=lambda blocknum, bs, size: None)
+      os.replace(filename + '.tmp', filename)
     ### load the data
     data = np.load(filename, allow_pickle=True)
-    self.x = data['x'].tolist().todense().astype(np.float32)
-    self.y = data['y'].tolist().todense().astype(np.float32)
-    assert md5_checksum(self.x) == data['xmd5'].tolist(), \
-      "MD5 for transcriptomic data mismatch"
-    assert md5_checksum(self.y) == data['ymd5'].tolist(), \
-      "MD5 for proteomic data mismatch"
+    xmd5 = data['xmd5'].tolist()
+    ymd5 = data['ymd5'].tolist()
+    # the densified arrays are cached next to the downloaded file and keyed
+    # by their MD5, the conversion and verification only run once
+    x_path = os.path.join(path, f'{self.dsname}_x_{xmd5}.npy')
+    y_path = os.path.join(path, f'{self.dsname}_y_{ymd5}.npy')
+    for key, md5, arr_path, desc in (('x', xmd5, x_path, 'transcriptomic'),
+                                     ('y', ymd5, y_path, 'proteomic')):
+      if os.path.exists(arr_path):
+        continue
+      # densify straight into the memory-mapped cache file
+      mat = data[key].tolist().astype(np.float32)
+      tmp_path = arr_path + '.tmp'
+      arr = np.lib.format.open_memmap(tmp_path,
+                                      mode='w+',
+                                      dtype=np.float32,
+                                      shape=mat.shape)
+      mat.toarray(out=arr)
+      assert md5_checksum(arr) == md5, f"MD5 for {desc} data mismatch"
+      arr.flush()
+      del arr, mat
+      os.replace(tmp_path, arr_path)
+    # copy-on-write memory map, in-place modification won't touch the cache
+    self.x = np.load(x_path, mmap_mode='c')
+    self.y = np.load(y_path, mmap_mode='c')
     self.xvar = data['xvar']
     self.yvar = data['yvar']
     self.pairs = data['pairs']
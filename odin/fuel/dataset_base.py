@@ -40,6 +40,25 @@ def get_partition(part,
   return ret
 
 
+def dataset_options(deterministic: bool = True) -> tf.data.Options:
+  """Return the `tf.data.Options` shared by all datasets, it enables the
+  static optimizations of the input pipeline (i.e. fusing `map` into
+  `batch`, fusing consecutive `map` and parallel batching).
+
+  Parameters
+  ----------
+  deterministic : bool, optional
+      if False, elements could be produced out of order when that is faster,
+      by default True
+  """
+  options = tf.data.Options()
+  options.experimental_optimization.map_and_batch_fusion = True
+  options.experimental_optimization.map_fusion = True
+  options.experimental_optimization.parallel_batch = True
+  options.experimental_deterministic = bool(deterministic)
+  return options
+
+
 def _merge_list(data):
   return [
     np.concatenate([x[i].numpy()
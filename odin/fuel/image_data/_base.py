@@ -10,7 +10,8 @@ from tqdm import tqdm
 from typing_extensions import Literal
 
 from odin.backend.types_helpers import DataType, LabelType
-from odin.fuel.dataset_base import IterableDataset, get_partition, Partition
+from odin.fuel.dataset_base import (IterableDataset, Partition,
+                                    dataset_options, get_partition)
 from odin.utils import as_tuple
 from odin.utils.cache_utils import get_cache_path
 from tensorflow.python.data import Dataset
@@ -393,6 +394,7 @@ class ImageDataset(IterableDataset):
       ds = ds.cache(filename=str(cache))
     if prefetch is not None:
       ds = ds.prefetch(buffer_size=prefetch)
+    ds = ds.with_options(dataset_options())
     ds: tf.data.Dataset
     return ds
 
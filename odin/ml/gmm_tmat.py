@@ -232,9 +232,15 @@ def _create_batch_indices(X, sad, indices, batch_size,
     yield np.concatenate(X_buffer, axis=0), n_selected_buffer, n_original_buffer
 
 class _ExpectationResults(object):
-  """ ExpectationResult """
+  """ ExpectationResult
 
-  def __init__(self, n_samples, nb_results, name, print_progress):
+  The partial statistics from each batch are accumulated in float64, then
+  casted back to `dtype` when returned, so the accumulation doesn't drift
+  when the E-step is running in float32.
+  """
+
+  def __init__(self, n_samples, nb_results, name, print_progress,
+               dtype=None):
     super(_ExpectationResults, self).__init__()
     # thread lock
     self.lock = threading.Lock()
@@ -243,9 +249,17 @@ class _ExpectationResults(object):
                         print_summary=False, name=name)
     # GMM: Z, F, S, L, nframes
     # I-vector: LU, RU, llk, nframes
-    self.stats = [0. for i in range(int(nb_results))]
+    self._stats = [0. for i in range(int(nb_results))]
+    self.dtype = None if dtype is None else np.dtype(dtype)
     self.print_progress = bool(print_progress)
 
+  @property
+  def stats(self):
+    if self.dtype is None:
+      return list(self._stats)
+    return [i.astype(self.dtype) if isinstance(i, np.ndarray) else i
+            for i in self._stats]
+
   def update(self, res):
     """
     integer (or a number): number of processed samples (update the progress bar)
@@ -260,7 +274,9 @@ class _ExpectationResults(object):
       # return the statistics, end of process
       else:
         for i, r in enumerate(res):
-          self.stats[i] += r
+          if isinstance(r, np.ndarray):
+            r = r.astype(np.float64)
+          self._stats[i] += r
     finally:
       self.lock.release()
 
@@ -829,34 +845,40 @@ class GMM(DensityMixin, BaseEstimator, TransformerMixin):
       if f_dat is not None:
         f_dat.append(F)
 
+    reduction = np.floor(np.power(2, self._curr_nmix / 1024))
+    zero = z_dat is not None or f_dat is not None
+    first = f_dat is not None
+
     def _batched_transform(s, e, on_gpu):
-      reduction = np.floor(np.power(2, self._curr_nmix / 1024))
       batch_size = self.batch_size_gpu if on_gpu else self.batch_size_cpu
       batch_size = int(batch_size / reduction)
       x = X[s:e]
       if sad is not None:
         x = x[sad[s:e].astype('bool')]
       if x.shape[0] <= batch_size:
-        res = [self._fast_expectation(x,
-                                     zero=z_dat is not None or f_dat is not None,
-                                     first=f_dat is not None,
-                                     second=False, llk=False,
-                                     on_gpu=on_gpu)]
+        batches = [(0, x.shape[0])]
       else:
-        res = [self._fast_expectation(x[start:end],
-                                      zero=z_dat is not None or f_dat is not None,
-                                      first=f_dat is not None,
-                                      second=False, llk=False,
-                                      on_gpu=on_gpu)
-               for start, end in minibatch(n=x.shape[0], batch_size=batch_size)]
-      Z = sum(r[0] for r in res)
-      if len(res[0]) == 2:
-        F = sum(r[1] for r in res)
+        batches = minibatch(n=x.shape[0], batch_size=batch_size)
+      # accumulate the statistics of all minibatches in the buffers
+      # returned by the first one, instead of summing a list of results
+      Z = None
+      F = None
+      for start, end in batches:
+        res = self._fast_expectation(x[start:end],
+                                     zero=zero, first=first,
+                                     second=False, llk=False,
+                                     on_gpu=on_gpu)
+        if Z is None:
+          Z = res[0]
+          F = res[1] if len(res) == 2 else None
+        else:
+          Z += res[0]
+          if F is not None:
+            F += res[1]
+      if F is not None:
         F = np.reshape(a=F - self.mean * Z,
                        newshape=(Z.shape[0], self._feat_dim * self._curr_nmix),
                        order='F')
-      else:
-        F = None
       return Z, F
     # ====== running on GPU ====== #
     if on_gpu:
@@ -1195,7 +1217,7 @@ class GMM(DensityMixin, BaseEstimator, TransformerMixin):
     results = _ExpectationResults(n_samples=n_samples, nb_results=5,
         name="[GMM] cmix:%d nmix:%d ndim:%d iter:%d" %
                    (curr_nmix, self.nmix, self.feat_dim, curr_niter + 1),
-        print_progress=print_progress)
+        print_progress=print_progress, dtype=self.dtype)
     mpi = []
     if len(jobs_cpu) > 0:
       # create CPU processes
@@ -1707,10 +1729,13 @@ class Tmatrix(DensityMixin, BaseEstimator, TransformerMixin):
     # (nfiles, tv_dim)
     B1 = np.dot(F, self.T_invS.T)
     Ex, Exx, llk = self._Ex_Exx_llk[nfiles]
+    # scratch precision matrix, allocated once and reused for all files
+    L = np.empty((self.tv_dim, self.tv_dim), dtype=self.dtype)
     for ix in range(nfiles):
-      L = np.zeros((self.tv_dim, self.tv_dim), dtype=self.dtype)
+      L.fill(0)
       L[self._itril] = L1[ix]
-      L = L + np.tril(L, k=-1).T + self.Im
+      L += np.tril(L, k=-1).T
+      L += self.Im
       Cxx = linalg.inv(L)
       B = B1[ix][:, np.newaxis]
       this_Ex = np.dot(Cxx, B)
@@ -1790,7 +1815,7 @@ class Tmatrix(DensityMixin, BaseEstimator, TransformerMixin):
           name="[Tmatrix] Tdim:%d nmix:%d feat_dim:%d iter:%d" %
                      (self.tv_dim, self.nmix, self.feat_dim,
                       len(self._llk_hist) + 1),
-          print_progress=print_progress)
+          print_progress=print_progress, dtype=self.dtype)
       # ====== create gpu thread ====== #
       mpi = MPI(jobs=jobs_cpu, func=_mpi_fn,
                 ncpu=self.ncpu, batch=1, hwm=2**25)
@@ -1830,9 +1855,10 @@ class Tmatrix(DensityMixin, BaseEstimator, TransformerMixin):
                         (self.nmix, len(self._llk_hist),
                          'CPU' if self.device == 'cpu' else 'GPU'))
     if self.device == 'cpu':
+      lu = np.empty((self.tv_dim, self.tv_dim), dtype=self.dtype)
       for mix in range(self.nmix):
         prog.add(1)
-        lu = np.zeros((self.tv_dim, self.tv_dim), dtype=self.dtype)
+        lu.fill(0)
         lu[self._itril] = LU[mix, :]
         lu += np.tril(lu, -1).T
         start = self.feat_dim * mix
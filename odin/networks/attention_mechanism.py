@@ -44,7 +44,9 @@ from __future__ import absolute_import, division, print_function
 import warnings
 from enum import IntFlag
 from enum import auto as enum_auto
-from functools import partial
+from functools import lru_cache, partial
+
+import numpy as np
 
 from odin import backend as bk
 from odin import bay
@@ -52,7 +54,28 @@ from odin.utils import as_tuple
 
 
 def _split_and_concat(x, num_heads):
-  return bk.stack(bk.split(x, num_heads, axis=-1), axis=0)
+  r""" `[batch_size, ..., num_heads * dim]` to
+  `[num_heads, batch_size, ..., dim]`, same as stacking the splits along the
+  last dimension but with a single reshape and transpose. Falls back to
+  split and stack when the inner dimensions are unknown (e.g. variable
+  length sequences) since the reshape could only infer one of them """
+  ndim = len(x.shape)
+  if any(i is None for i in x.shape[1:-1]):
+    return bk.stack(bk.split(x, num_heads, axis=-1), axis=0)
+  x = bk.reshape(x, [-1] + [i for i in x.shape[1:-1]] +
+                 [num_heads, x.shape[-1] // num_heads])
+  return bk.transpose(x, [ndim - 1] + list(range(ndim - 1)) + [ndim])
+
+
+@lru_cache(maxsize=32)
+def _causal_mask(ndim, Tq, Tv):
+  r""" Lower triangular mask of shape `[1, ..., 1, Tq, Tv]`, position `i`
+  cannot attend to positions `j > i`. Cached for each shape, the returned
+  array is read-only """
+  mask = np.tril(np.ones((Tq, Tv), dtype=bool))
+  mask = np.reshape(mask, [1] * (ndim - 2) + [Tq, Tv])
+  mask.setflags(write=False)
+  return mask
 
 
 def _get_num_heads(query):
@@ -292,12 +315,11 @@ class AttentionMechanism(IntFlag):
     scores = bk.swapaxes(scoresT, 1, 2)
     # [batch_size, num_heads, num_heads]
     A = bk.matmul(scoresT, scores)
-    # [batch_size, num_heads, num_heads]
-    I = bk.eye(num_heads, dtype=A.dtype)
-    I = bk.expand_dims(I, axis=0)
-    I = bk.tile(I, reps=A.shape[0], axis=0)
-    # normalized
-    P = bk.norm(A - I, p="fro")**2
+    # expand `||A - I||^2 = ||A||^2 - 2 * tr(A) + num_heads` for each batch,
+    # the diagonal of `A` are the squared norms of the heads, no need for
+    # a tiled identity
+    trace = bk.reduce_sum(bk.square(scoresT))
+    P = bk.reduce_sum(bk.square(A)) - 2 * trace + A.shape[0] * num_heads
     return P
 
   def score(self,
@@ -386,8 +408,15 @@ class AttentionMechanism(IntFlag):
         q = bk.expand_dims(query, axis=2)
         # [batch_size * num_heads, 1, Tv, dim]
         k = bk.expand_dims(key, axis=1)
+        # [batch_size * num_heads, Tq, Tv, dim]
+        scores = bk.tanh(q + k)
+        # contract the scale with the feature axis directly, so no second
+        # `[..., Tq, Tv, dim]` tensor is created for `scale * tanh(q + k)`
         # [batch_size * num_heads, Tq, Tv]
-        scores = bk.reduce_sum(scale * bk.tanh(q + k), axis=-1)
+        if len(scale.shape) == 0:
+          scores = scale * bk.reduce_sum(scores, axis=-1)
+        else:
+          scores = bk.tensordot(scores, scale, axis=1)
       ### Dot product or multiplicative scoring
       elif AttentionMechanism.ScoreDotProd in self:
         # this is a trick to make attention_scale broadcastable when
@@ -489,11 +518,8 @@ class AttentionMechanism(IntFlag):
       # Creates a lower triangular mask, so position i cannot attend to
       # positions j>i. This prevents the flow of information from the future
       # into the past.
-      scores_shape = scores.shape
       # causal_mask_shape = [1, Tq, Tv].
-      causal_mask_shape = bk.concatenate(
-          [bk.ones_like(scores_shape[:-2]), scores_shape[-2:]], axis=0)
-      causal_mask = bk.tril_mask(causal_mask_shape)
+      causal_mask = _causal_mask(len(scores.shape), Tq, Tv)
     else:
       causal_mask = None
     if v_mask is not None:
@@ -34,11 +34,11 @@ class PositionalEncoder(keras.layers.Layer):
     # if zero-masked, dont use the 0 position
     # (i - i % 2) create a sequence of (0,0,1,1,2,2,...) which is needed
     # for two running sequence of sin and cos in odd and even position
-    position_encoding = np.array([[
-        pos / np.power(10000, (i - i % 2) / output_dim)
-        for i in range(output_dim)
-    ] if pos != 0 or not mask_zero else [0.] * output_dim
-                                  for pos in range(max_len)])
+    i = np.arange(output_dim)
+    position_encoding = (np.arange(max_len)[:, np.newaxis] /
+                         np.power(10000, (i - i % 2) / output_dim))
+    if mask_zero:
+      position_encoding[0] = 0.
     # [max_len, output_dim]
     position_encoding[:, 0::2] = np.sin(position_encoding[:, 0::2])  # dim 2i
     position_encoding[:, 1::2] = np.cos(position_encoding[:, 1::2])  # dim 2i+1
@@ -59,14 +59,11 @@ class PositionalEncoder(keras.layers.Layer):
 
   def call(self, sequence, training=None):
     with bk.framework_(self):
-      # [batch_size, time_dim]
-      positions = bk.tile(bk.expand_dims(bk.arange(sequence.shape[1]), 0),
-                          [sequence.shape[0], 1])
-      dtype = bk.dtype_universal(positions.dtype)
-      if dtype not in ('int32', 'int64'):
-        positions = bk.cast(positions, dtype='int32')
-      pe = bk.embedding(indices=positions, weight=self.position_encoding)
-      return pe
+      # positions are always 0...time_dim-1, slice the table once instead of
+      # looking up a [batch_size, time_dim] tile of indices
+      pe = self.position_encoding[:sequence.shape[1]]
+      # [batch_size, time_dim, output_dim]
+      return bk.tile(bk.expand_dims(pe, 0), sequence.shape[0], axis=0)
 
   def get_config(self):
     config = super().get_config()
@@ -20,7 +20,7 @@ from numbers import Number
 
 import numpy as np
 from six import add_metaclass, string_types
-from six.moves import cPickle, range, zip, zip_longest
+from six.moves import cPickle, zip, zip_longest
 from sklearn.pipeline import Pipeline
 
 from bigarray import MmapArray
@@ -130,6 +130,27 @@ def _escape_file_name(file_name):
   return file_name
 
 
+def _reservoir_sample(iterable, k, rand):
+  """ Uniformly draw `k` items from `iterable` in a single pass
+  (Algorithm R), without materializing all of its items
+
+  Raise `ValueError` if `iterable` has fewer than `k` items (same as
+  `np.random.choice(..., replace=False)`)
+  """
+  samples = []
+  for i, item in enumerate(iterable):
+    if i < k:
+      samples.append(item)
+    else:
+      j = rand.randint(0, i + 1)
+      if j < k:
+        samples[j] = item
+  if len(samples) < k:
+    raise ValueError("Cannot take a larger sample (%d) than population (%d) "
+                     "without replacement" % (k, len(samples)))
+  return samples
+
+
 def _special_cases(X, feat_name, file_name, ds, path):
   """ Same special for checking the integrity of the features """
   if feat_name == 'raw':
@@ -326,26 +347,27 @@ def validate_features(ds_or_processor,
       n = ds[feat_name].shape[0]
       nb_feats = ds[feat_name].shape[-1]
       fail_test = False
-      # performing PCA on random samples
-      for i in range(nb_samples):
-        start = np.random.randint(0, n - nb_samples - 1)
-        X = pca.transform(ds[feat_name][start:(start + nb_samples)],
-                          n_components=max(nb_feats // 2, 1))
-        if np.any(np.isnan(X)):
-          logger("NaN values in PCA", feat_name, False)
-          fail_test = True
-          break
-        if np.all(np.isclose(X, 0.)):
-          logger("All-closed-zeros values in PCA", feat_name, False)
-          fail_test = True
-          break
+      # performing PCA on random samples, all segments are gathered and
+      # transformed in a single call, then checked segment by segment
+      starts = np.random.randint(0, n - nb_samples - 1, size=nb_samples)
+      X = np.concatenate(
+          [ds[feat_name][start:(start + nb_samples)] for start in starts],
+          axis=0)
+      X = pca.transform(X, n_components=max(nb_feats // 2, 1))
+      X = np.reshape(X, (nb_samples, nb_samples, -1))
+      if np.any(np.isnan(X)):
+        logger("NaN values in PCA", feat_name, False)
+        fail_test = True
+      elif np.any(np.all(np.isclose(X, 0.), axis=(1, 2))):
+        logger("All-closed-zeros values in PCA", feat_name, False)
+        fail_test = True
       if not fail_test:
         logger("Check PCA for: ", feat_name, True)
   # ====== Do sampling ====== #
-  np.random.seed(seed)  # seed for reproceducible
-  all_samples = np.random.choice(list(ds['indices'].keys()),
-                                 size=nb_samples,
-                                 replace=False)
+  # seed for reproceducible
+  all_samples = _reservoir_sample(ds['indices'].keys(),
+                                  k=nb_samples,
+                                  rand=np.random.RandomState(seed))
   # plotting all samples
   for sample_id, file_name in enumerate(all_samples):
     X = {}
@@ -20,7 +20,6 @@ from __future__ import print_function, division, absolute_import
 import os
 import six
 import copy
-import warnings
 import subprocess
 from io import BytesIO
 from numbers import Number
@@ -28,7 +27,7 @@ from six import string_types
 
 import numpy as np
 import scipy as sp
-from scipy import linalg, fftpack, signal
+from scipy import fft, fftpack, linalg, ndimage, signal
 from numpy.lib.stride_tricks import as_strided
 try:
   from odin.utils import cache_memory, cache_disk
@@ -41,6 +40,8 @@ except ImportError:
 
 # Constrain STFT block sizes to 512 KB
 MAX_MEM_BLOCK = 2**8 * 2**11
+# decibel per unit of log2 power, i.e. `10 * log10(x) = _DB_PER_LOG2 * log2(x)`
+_DB_PER_LOG2 = 10.0 / np.log2(10.0)
 # ===========================================================================
 # Helper
 # ===========================================================================
@@ -290,6 +291,45 @@ def set_vad_mode(mode):
     mode = min(max(mode, 1.), 2.4)
     __current_vad_mode = float(mode)
 
+def _gmm_1d(x, means, max_iter, tol=1e-3, reg_covar=1e-6):
+  """ EM for a 1-D diagonal Gaussian mixture, the same updates and stopping
+  rule as `sklearn.mixture.GaussianMixture(covariance_type='diag')` with
+  uniform `weights_init` and unit `precisions_init`, without the estimator
+  overhead (input validation, k-means initialization) which dominates the
+  cost of a few iterations on one log-energy vector.
+
+  Return
+  ------
+  means, variances: arrays of shape `[n_components]`
+  """
+  x = np.asarray(x, dtype='float64')[:, np.newaxis]
+  n_components = len(means)
+  if not np.all(np.isfinite(x)) or x.shape[0] < n_components:
+    raise ValueError("Cannot fit %d components on %d samples" %
+                     (n_components, x.shape[0]))
+  log_w = np.full(n_components, -np.log(n_components))
+  mu = np.asarray(means, dtype='float64')
+  var = np.ones(n_components)
+  lower_bound = -np.inf
+  for _ in range(max_iter):
+    # E-step
+    log_prob = log_w - 0.5 * (np.log(2 * np.pi) + np.log(var) +
+                              (x - mu)**2 / var)
+    log_norm = np.logaddexp.reduce(log_prob, axis=1)
+    resp = np.exp(log_prob - log_norm[:, np.newaxis])
+    # M-step
+    nk = resp.sum(axis=0) + 10 * np.finfo(resp.dtype).eps
+    mu = np.dot(x.T, resp).ravel() / nk
+    var = np.dot((x**2).T, resp).ravel() / nk - mu**2 + reg_covar
+    if np.any(var <= 0.):
+      raise ValueError("Fitting the mixture model failed because some "
+                       "components have ill-defined empirical covariance")
+    log_w = np.log(nk / nk.sum())
+    prev_lower_bound, lower_bound = lower_bound, np.mean(log_norm)
+    if abs(lower_bound - prev_lower_bound) < tol:
+      break
+  return mu, var
+
 def vad_energy(log_energy, distrib_nb=3, nb_train_it=25):
   """ Fitting Gaussian mixture model on the log-energy and the voice
   activity is the component with highest energy.
@@ -299,35 +339,26 @@ def vad_energy(log_energy, distrib_nb=3, nb_train_it=25):
   vad: array of 0, 1
   threshold: scalar
   """
-  from sklearn.exceptions import ConvergenceWarning
-  from sklearn.mixture import GaussianMixture
   # center and normalize the energy
   log_energy = (log_energy - np.mean(log_energy)) / np.std(log_energy)
-  if log_energy.ndim == 1:
-    log_energy = log_energy[:, np.newaxis]
-  # create mixture model: diag, spherical
-  world = GaussianMixture(
-      n_components=distrib_nb, covariance_type='diag',
-      init_params='kmeans', max_iter=nb_train_it,
-      weights_init=np.ones(distrib_nb) / distrib_nb,
-      means_init=(-2 + 4.0 * np.arange(distrib_nb) / (distrib_nb - 1))[:, np.newaxis],
-      precisions_init=np.ones((distrib_nb, 1)),
-  )
+  log_energy = log_energy.ravel()
+  # fit mixture model (diag) on the 1-D energy
   try:
-    with warnings.catch_warnings():
-      warnings.filterwarnings("ignore", category=ConvergenceWarning)
-      world.fit(log_energy)
-  except (ValueError, IndexError): # index error because of float32 cumsum
+    means, variances = _gmm_1d(
+        log_energy,
+        means=-2 + 4.0 * np.arange(distrib_nb) / (distrib_nb - 1),
+        max_iter=nb_train_it)
+  except ValueError:
     if distrib_nb - 1 >= 2:
       return vad_energy(log_energy,
                         distrib_nb=distrib_nb - 1,
                         nb_train_it=nb_train_it)
     return np.zeros(shape=(log_energy.shape[0],)), 0
   # Compute threshold
-  threshold = world.means_.max() - \
-      __current_vad_mode * np.sqrt(1.0 / world.precisions_[world.means_.argmax(), 0])
+  threshold = means.max() - \
+      __current_vad_mode * np.sqrt(variances[means.argmax()])
   # Apply frame selection with the current threshold
-  label = log_energy.ravel() > threshold
+  label = log_energy > threshold
   return label, threshold
 
 def vad_threshold(frames, threshold=35):
@@ -512,18 +543,18 @@ def hz2mel(frequencies):
   mel_to_hz
   """
   frequencies = np.atleast_1d(frequencies)
-  # Fill in the linear part
+  # The linear part
   f_min = 0.0
   f_sp = 200.0 / 3
   mels = (frequencies - f_min) / f_sp
-  # Fill in the log-scale part
+  # The log-scale part, clamped so that the unused linear-region entries
+  # never reach `log(0)`
   min_log_hz = 1000.0                         # beginning of log region (Hz)
   min_log_mel = (min_log_hz - f_min) / f_sp   # same (Mels)
   logstep = np.log(6.4) / 27.0                # step size for log region
-
-  log_t = (frequencies >= min_log_hz)
-  mels[log_t] = min_log_mel + np.log(frequencies[log_t] / min_log_hz) / logstep
-  return mels
+  log_mels = min_log_mel + \
+    np.log(np.maximum(frequencies, min_log_hz) / min_log_hz) / logstep
+  return np.where(frequencies >= min_log_hz, log_mels, mels)
 
 def mel2hz(mels):
   """Convert mel bin numbers to frequencies
@@ -562,10 +593,10 @@ def mel2hz(mels):
   min_log_hz = 1000.0                         # beginning of log region (Hz)
   min_log_mel = (min_log_hz - f_min) / f_sp   # same (Mels)
   logstep = np.log(6.4) / 27.0                # step size for log region
-  log_t = (mels >= min_log_mel)
-
-  freqs[log_t] = min_log_hz * np.exp(logstep * (mels[log_t] - min_log_mel))
-  return freqs
+  # clamped so that the unused linear-region entries never overflow `exp`
+  log_freqs = min_log_hz * np.exp(logstep *
+                                  (np.maximum(mels, min_log_mel) - min_log_mel))
+  return np.where(mels >= min_log_mel, log_freqs, freqs)
 
 def mel_frequencies(n_mels=128, fmin=0.0, fmax=11025.0):
   """Compute the center frequencies of mel bands.
@@ -633,7 +664,7 @@ def db2power(S_db, ref=1.0):
   '''
   return ref * np.power(10.0, 0.1 * S_db)
 
-def power2db(S, ref=1.0, amin=1e-10, top_db=80.0):
+def power2db(S, ref=1.0, amin=1e-10, top_db=80.0, peak=None):
   """Convert a power spectrogram (amplitude/magnitude squared)
   to decibel (dB) units (using logarithm)
 
@@ -656,6 +687,12 @@ def power2db(S, ref=1.0, amin=1e-10, top_db=80.0):
   top_db : float >= 0 [scalar]
       threshold the output at `top_db` below the peak:
       ``max(10 * log10(S)) - top_db``
+      If `None`, no thresholding is applied.
+  peak : {None, scalar}
+      the peak (in dB, relative to `ref`) used for the `top_db` threshold,
+      if `None`, it is the maximum of the output. Passing a known peak
+      (e.g. computed once per utterance) skips a full reduction over the
+      spectrogram.
 
   Returns
   -------
@@ -664,23 +701,33 @@ def power2db(S, ref=1.0, amin=1e-10, top_db=80.0):
   """
   if amin <= 0:
     raise ValueError('amin must be strictly positive')
-  magnitude = np.abs(S)
+  magnitude = np.asarray(np.abs(S))
+  if not np.issubdtype(magnitude.dtype, np.floating):
+    magnitude = magnitude.astype(np.float64)
   if hasattr(ref, '__call__'):
     # User supplied a function to calculate reference power
     ref_value = ref(magnitude)
   else:
     ref_value = np.abs(ref)
-  log_spec = 10.0 * np.log10(np.maximum(amin, magnitude))
-  log_spec -= 10.0 * np.log10(np.maximum(amin, ref_value))
+  # `10 * log10(x) = (10 / log2(10)) * log2(x)`, computed in-place on the
+  # magnitude buffer, no extra temporaries
+  log_spec = np.maximum(magnitude, amin, out=magnitude)
+  np.log2(log_spec, out=log_spec)
+  log_spec *= _DB_PER_LOG2
+  ref_db = _DB_PER_LOG2 * np.log2(np.maximum(amin, ref_value))
+  if np.any(ref_db != 0):  # skip the pass for the default `ref=1.0`
+    log_spec -= ref_db
   # clip top db
   if top_db is not None:
     if top_db < 0:
       raise ValueError('top_db must be non-negative')
-    log_spec = np.maximum(log_spec, log_spec.max() - top_db)
+    if peak is None:
+      peak = log_spec.max()
+    np.maximum(log_spec, peak - top_db, out=log_spec)
   return log_spec
 
 @cache_memory
-def dct_filters(n_filters, n_input):
+def dct_filters(n_filters, n_input, dtype='float64'):
   """Discrete cosine transform (DCT type-III) basis.
 
   .. [1] http://en.wikipedia.org/wiki/Discrete_cosine_transform
@@ -695,6 +742,10 @@ def dct_filters(n_filters, n_input):
   n_input : int > 0 [scalar]
       number of input components (frequency bins)
 
+  dtype : np.dtype
+      data type of the returned basis, the basis is always computed in
+      float64 then cast, a separate copy is cached for each `dtype`
+
   Returns
   -------
   dct_basis: np.ndarray [shape=(n_filters, n_input)]
@@ -727,13 +778,13 @@ def dct_filters(n_filters, n_input):
   basis[0, :] = 1.0 / np.sqrt(n_input)
 
   samples = np.arange(1, 2 * n_input, 2) * np.pi / (2.0 * n_input)
-
-  for i in range(1, n_filters):
-    basis[i, :] = np.cos(i * samples) * np.sqrt(2.0 / n_input)
-  return basis
+  # all the cosine rows at once as an outer product
+  basis[1:, :] = np.cos(np.multiply.outer(np.arange(1, n_filters), samples))
+  basis[1:, :] *= np.sqrt(2.0 / n_input)
+  return basis.astype(dtype, copy=False)
 
 @cache_memory
-def mel_filters(sr, n_fft, n_mels=128, fmin=0.0, fmax=None):
+def mel_filters(sr, n_fft, n_mels=128, fmin=0.0, fmax=None, dtype='float64'):
   """Create a Filterbank matrix to combine FFT bins into Mel-frequency bins
   Original code: librosa
 
@@ -755,6 +806,10 @@ def mel_filters(sr, n_fft, n_mels=128, fmin=0.0, fmax=None):
       highest frequency (in Hz).
       If `None`, use `fmax = sr / 2.0`
 
+  dtype     : np.dtype
+      data type of the returned filters, the filters are always computed in
+      float64 then cast, a separate copy is cached for each `dtype`
+
   Returns
   -------
   M         : np.ndarray [shape=(n_mels, 1 + n_fft/2)]
@@ -772,9 +827,7 @@ def mel_filters(sr, n_fft, n_mels=128, fmin=0.0, fmax=None):
   """
   if fmax is None:
     fmax = float(sr) / 2
-  # Initialize the weights
   n_mels = int(n_mels)
-  weights = np.zeros((n_mels, int(1 + n_fft // 2)))
 
   # Center freqs of each FFT bin
   fftfreqs = np.linspace(0, float(sr) / 2, int(1 + n_fft // 2),
@@ -786,15 +839,16 @@ def mel_filters(sr, n_fft, n_mels=128, fmin=0.0, fmax=None):
   mel_f = mel2hz(mels=np.linspace(min_mel, max_mel, n_mels + 2))
 
   fdiff = np.diff(mel_f)
-  ramps = np.subtract.outer(mel_f, fftfreqs)
 
-  for i in range(n_mels):
-    # lower and upper slopes for all bins
-    lower = -ramps[i] / fdiff[i]
-    upper = ramps[i + 2] / fdiff[i + 1]
+  # lower and upper slopes for all bands and bins at once, broadcast
+  # directly from the band edges, no [n_mels + 2, 1 + n_fft // 2] ramps
+  # [n_mels, 1 + n_fft // 2]
+  weights = (fftfreqs - mel_f[:-2, np.newaxis]) / fdiff[:-1, np.newaxis]
+  upper = (mel_f[2:, np.newaxis] - fftfreqs) / fdiff[1:, np.newaxis]
 
-    # .. then intersect them with each other and zero
-    weights[i] = np.maximum(0, np.minimum(lower, upper))
+  # .. then intersect them with each other and zero
+  np.minimum(weights, upper, out=weights)
+  np.maximum(weights, 0, out=weights)
 
   # Slaney-style mel is scaled to be approx constant energy per channel
   enorm = 2.0 / (mel_f[2:n_mels + 2] - mel_f[:n_mels])
@@ -807,7 +861,7 @@ def mel_filters(sr, n_fft, n_mels=128, fmin=0.0, fmax=None):
           'Some channels will produce empty responses. '
           'Try increasing your sampling rate (and fmax) or '
           'reducing n_mels.')
-  return weights
+  return weights.astype(dtype, copy=False)
 
 @cache_memory
 def get_window(window, frame_length, periodic=True):
@@ -961,10 +1015,33 @@ def pre_emphasis(s, coeff=0.97):
   coeff: float (0, 1)
       coefficience that defines the pre-emphasis filter.
   """
+  # a single output buffer, the shifted and scaled signal is written into it
+  # then subtracted in-place
+  out = np.empty(s.shape, dtype=np.result_type(s, coeff))
   if s.ndim == 1:
-    return np.append(s[0], s[1:] - coeff * s[:-1])
+    np.multiply(s[:-1], coeff, out=out[1:])
+    np.subtract(s[1:], out[1:], out=out[1:])
+    out[0] = s[0]
   else:
-    return s - np.c_[s[:, :1], s[:, :-1]] * coeff
+    np.multiply(s[:, :1], coeff, out=out[:, :1])
+    np.multiply(s[:, :-1], coeff, out=out[:, 1:])
+    np.subtract(s, out, out=out)
+  return out
+
+_SMOOTH_WINDOWS = {
+    # moving average
+    'flat': lambda win: np.ones(win, dtype='d'),
+    'hanning': np.hanning,
+    'hamming': np.hamming,
+    'bartlett': np.bartlett,
+    'blackman': np.blackman,
+}
+
+@cache_memory
+def _smooth_window(window, win):
+  """ Normalized smoothing window, cached for each `(window, win)` """
+  w = _SMOOTH_WINDOWS[window](win)
+  return w / w.sum()
 
 def smooth(x, win=11, window='hanning'):
   """
@@ -985,20 +1062,23 @@ def smooth(x, win=11, window='hanning'):
   """
   if win < 3:
     return x
-  if window not in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
+  if window not in _SMOOTH_WINDOWS:
     raise ValueError("Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
   s = np.concatenate([2 * x[0] - x[win - 1::-1],
                       x,
                       2 * x[-1] - x[-1:-win:-1]], axis=0)
-  # moving average
-  if window == 'flat':
-    w = np.ones(win, dtype='d')
-  # windowing
-  else:
-    w = eval('np.' + window + '(win)')
-  y = np.convolve(w / w.sum(), s, mode='same')
+  y = np.convolve(_smooth_window(window, win), s, mode='same')
   return y[win:-win + 1]
 
+@cache_memory
+def _delta_window(width):
+  """ Normalized (scale-invariant) delta FIR window, cached for each
+  `width` """
+  half_length = 1 + int(width // 2)
+  window = np.arange(half_length - 1., -half_length, -1.)
+  window /= np.sum(np.abs(window)**2)
+  return window
+
 def delta(data, width=9, order=1, axis=0):
   r'''Compute delta features: local estimate of the derivative
   of the input data along the selected axis.
@@ -1040,30 +1120,32 @@ def delta(data, width=9, order=1, axis=0):
     raise ValueError('order must be a positive integer')
 
   half_length = 1 + int(width // 2)
-  window = np.arange(half_length - 1., -half_length, -1.)
-
-  # Normalize the window so we're scale-invariant
-  window /= np.sum(np.abs(window)**2)
-
+  window = _delta_window(int(width))
+
+  # ====== first order delta ====== #
+  # filtering the edge-padded data then trimming is a centered FIR with
+  # repeated border values, no padded copy is needed
+  if order == 1:
+    return ndimage.convolve1d(data, window, axis=axis, mode='nearest',
+                              output=np.float64).astype('float32')
+  # ====== higher order deltas ====== #
+  # the higher orders filter the padded (border) part of the previous delta
+  # as well, the whole chain (first order included) keeps the original
+  # padding for identical results
   # Pad out the data by repeating the border values (delta=0)
   padding = [(0, 0)] * data.ndim
   width = int(width)
   padding[axis] = (width, width)
   delta_x = np.pad(data, padding, mode='edge')
-
-  # ====== compute deltas ====== #
-  all_deltas = []
+  # Cut back to the original shape of the input data
+  idx = [slice(None)] * data.ndim
+  idx[axis] = slice(- half_length - data.shape[axis], - half_length)
+  idx = tuple(idx)
+  trim_deltas = []
   for _ in range(order):
     delta_x = signal.lfilter(window, 1, delta_x, axis=axis)
-    all_deltas.append(delta_x)
-  # ====== Cut back to the original shape of the input data ====== #
-  trim_deltas = []
-  for delta_x in all_deltas:
-    idx = [slice(None)] * delta_x.ndim
-    idx[axis] = slice(- half_length - data.shape[axis], - half_length)
-    delta_x = delta_x[idx]
-    trim_deltas.append(delta_x.astype('float32'))
-  return trim_deltas[0] if order == 1 else trim_deltas
+    trim_deltas.append(delta_x[idx].astype('float32'))
+  return trim_deltas
 
 def shifted_deltas(x, N=7, d=1, P=3, k=7):
   """ Calculate Shifted Delta Coefficients
@@ -1197,19 +1279,18 @@ def pad_sequences(sequences, maxlen=None, dtype='int32',
   if padding not in ('pre', 'post'):
     raise ValueError('padding must be "pre" or "post", given value is %s'
                      % padding)
-  if transformer is None:
-    transformer = lambda x: x
-  if not hasattr(transformer, '__call__'):
+  if transformer is not None and not hasattr(transformer, '__call__'):
     raise ValueError('transformer must be call-able, but given value is %s' %
                      type(transformer))
   # ====== processing ====== #
   if maxlen is None:
     maxlen = int(max(len(s) for s in sequences))
   nb_samples = len(sequences)
-  value = np.cast[dtype](value)
+  value = np.asarray(value, dtype=dtype)
   X = np.full(shape=(nb_samples, maxlen), fill_value=value, dtype=dtype)
   for idx, s in enumerate(sequences):
-    s = [transformer(_) for _ in s]
+    if not hasattr(s, '__len__'):
+      s = list(s)
     if len(s) == 0: continue # empty list
     # check truncating
     if len(s) >= maxlen:
@@ -1218,6 +1299,10 @@ def pad_sequences(sequences, maxlen=None, dtype='int32',
     # check padding
     elif len(s) < maxlen:
       slice_ = slice(-len(s), None) if padding == 'pre' else slice(None, len(s))
+    # transform only the kept elements, no per-element call without
+    # a transformer
+    if transformer is not None:
+      s = [transformer(_) for _ in s]
     # assign value
     X[idx, slice_] = np.asarray(s, dtype=dtype)
   return X
@@ -1294,7 +1379,7 @@ def stack_frames(X, frame_length, step_length=None,
   return np.lib.stride_tricks.as_strided(X, shape=shape, strides=strides)
 
 def segment_axis(a, frame_length=2048, step_length=512, axis=0,
-                 end='cut', pad_value=0, pad_mode='post'):
+                 end='cut', pad_value=0, pad_mode='post', contiguous=False):
   """Generate a new array that chops the given array along the given axis
   into overlapping frames.
 
@@ -1329,13 +1414,19 @@ def segment_axis(a, frame_length=2048, step_length=512, axis=0,
   pad_mode: 'pre', 'post'
       if "pre", padding or wrapping at the beginning of the array.
       if "post", padding or wrapping at the ending of the array.
+  contiguous: bool
+      if True, return a C-contiguous copy of the frames instead of a strided
+      view, useful when the frames are consumed many times (e.g. FFT, matrix
+      product) and overlapping frames would be gathered from the source
+      buffer on every pass.
 
   Return
   ------
   a ndarray
 
   The array is not copied unless necessary (either because it is unevenly
-  strided and being flattened or because end is set to 'pad' or 'wrap').
+  strided and being flattened, because end is set to 'pad' or 'wrap', or
+  because `contiguous=True`).
 
   Note
   ----
@@ -1392,7 +1483,7 @@ def segment_axis(a, frame_length=2048, step_length=512, axis=0,
         raise RuntimeError("No support for pad mode: %s" % pad_mode)
       a = b
     a = a.swapaxes(-1, axis)
-    length = a.shape[0] # update length
+    length = a.shape[axis] # update length
 
   if length == 0:
     raise ValueError("Not enough data points to segment array " +
@@ -1403,17 +1494,12 @@ def segment_axis(a, frame_length=2048, step_length=512, axis=0,
   s = a.strides[axis]
   newshape = a.shape[:axis] + (n, frame_length) + a.shape[axis + 1:]
   newstrides = a.strides[:axis] + ((frame_length - overlap) * s, s) + a.strides[axis + 1:]
-
-  try:
-    return np.ndarray.__new__(np.ndarray, strides=newstrides,
-                              shape=newshape, buffer=a, dtype=a.dtype)
-  except TypeError:
-    a = a.copy()
-    # Shape doesn't change but strides does
-    newstrides = a.strides[:axis] + ((frame_length - overlap) * s, s) \
-    + a.strides[axis + 1:]
-    return np.ndarray.__new__(np.ndarray, strides=newstrides,
-                              shape=newshape, buffer=a, dtype=a.dtype)
+  # a view on any memory layout, never copy (`np.ndarray.__new__` needs a
+  # buffer-exposing array and fell back to a copy otherwise)
+  frames = as_strided(a, shape=newshape, strides=newstrides)
+  if contiguous:
+    frames = np.ascontiguousarray(frames)
+  return frames
 
 # ===========================================================================
 # Fourier transform
@@ -1432,7 +1518,11 @@ def get_energy(frames, log=True):
   ------
   E : ndarray [shape=(nb_frames,), dtype=float32]
   """
-  log_energy = (frames**2).sum(axis=1)
+  # row-wise sum of squares in one pass, no squared copy of the frames,
+  # integer frames are accumulated in float64 (no overflow)
+  dtype = frames.dtype if np.issubdtype(frames.dtype, np.floating) else \
+    np.float64
+  log_energy = np.einsum('ij,ij->i', frames, frames, dtype=dtype)
   log_energy = np.where(log_energy == 0., np.finfo(np.float32).eps,
                         log_energy)
   if log:
@@ -1442,7 +1532,7 @@ def get_energy(frames, log=True):
 def stft(y,
          frame_length=None, step_length=None, n_fft=None,
          window='hann', scale=None,
-         padding=False, energy=False):
+         padding=False, energy=False, workers=None):
   """Short-time Fourier transform (STFT)
 
   Returns a complex-valued matrix D such that
@@ -1487,6 +1577,12 @@ def stft(y,
   energy: bool
       if True, return log-frame-wise energy
 
+  workers: {None, int}
+      number of threads used by `scipy.fft.rfft` to transform the frames,
+      negative values count back from `os.cpu_count()`. Default (`None`)
+      is single-threaded, threading only pays off for long signals and
+      oversubscribes the CPU when called from multiple processes.
+
   Returns
   -------
   D : np.ndarray [shape=(t, 1 + n_fft/2), dtype=complex64]
@@ -1542,7 +1638,16 @@ def stft(y,
   if window is not None:
     fft_window = get_window(window, frame_length, periodic=True
         ).reshape(1, -1)
-    y_frames = fft_window * y_frames
+    # keep the precision of the signal, a float32 signal is windowed and
+    # transformed in single precision (complex64 output)
+    if np.issubdtype(y_frames.dtype, np.floating):
+      fft_window = fft_window.astype(y_frames.dtype, copy=False)
+    # rectangular window (e.g. 'boxcar'), no need for the windowed copy
+    if not np.all(fft_window == 1.):
+      y_frames = fft_window * y_frames
+    elif not np.issubdtype(y_frames.dtype, np.floating):
+      # the window product is what converts integer signals to float
+      y_frames = y_frames.astype(fft_window.dtype)
     # scaling factor
     scale = np.sqrt(1.0 / fft_window.sum()**2) if scale is None else float(scale)
   else:
@@ -1552,7 +1657,9 @@ def stft(y,
     log_energy = get_energy(y_frames, log=True).astype('float32')
   # ====== STFT matrix ====== #
   # norm='ortho' ?
-  S = np.fft.rfft(a=y_frames, n=n_fft, axis=-1)
+  # pocketfft (`scipy.fft`) transforms float32 frames in single precision,
+  # `np.fft` (numpy < 2.0) always computes and returns double precision
+  S = fft.rfft(y_frames, n=n_fft, axis=-1, workers=workers)
   # this scale is important for iSTFT reconstruct original signal
   if scale is not None:
     S *= scale
@@ -1640,13 +1747,25 @@ def power_spectrogram(S, power=2.0):
   # ====== extract the magnitude spectrogram ====== #
   if 'complex' in str(S.dtype): # get magnitude from STFT
     spec = np.abs(S)
+    # ====== power ====== #
+    # in-place on the new magnitude buffer, no extra pass over a temporary
+    if power > 1:
+      np.power(spec, power, out=spec)
+  elif power > 1:
+    spec = np.power(S, power)
   else:
     spec = S
-  # ====== power ====== #
-  if power > 1:
-    spec = np.power(spec, power)
   return spec
 
+def _basis_dtype(x):
+  """ Name of the floating dtype, at least float32, for projecting `x` onto
+  a cached filter bank (float64 for non-floating input) """
+  dtype = np.asarray(x).dtype
+  if not np.issubdtype(dtype, np.floating):
+    return 'float64'
+  # no half precision bank, power spectra overflow float16
+  return np.result_type(dtype, np.float32).name
+
 def mels_spectrogram(spec, sr, n_mels,
                      fmin=64, fmax=None, top_db=80.0):
   """ Extracting mel-filter bands from power spectrum
@@ -1681,12 +1800,16 @@ def mels_spectrogram(spec, sr, n_mels,
     raise ValueError("fmin must < fmax, but fmin=%d and fmax=%d" %
                      (fmin, fmax))
   # ====== mel transform ====== #
+  # project in the precision of the spectrogram but at least float32, a
+  # float32 spectrogram is not upcast to float64 by the cached float64
+  # basis, and a float16 one does not overflow in the product
   mel_basis = mel_filters(sr,
       n_fft=n_fft, n_mels=24 if n_mels is None else int(n_mels),
-      fmin=fmin, fmax=fmax)
-  # transpose to (nb_samples; nb_mels)
-  mel_spec = np.dot(mel_basis, spec.T)
-  mel_spec = mel_spec.T
+      fmin=fmin, fmax=fmax, dtype=_basis_dtype(spec))
+  if np.issubdtype(spec.dtype, np.floating):
+    spec = spec.astype(mel_basis.dtype, copy=False)
+  # (nb_samples; nb_mels)
+  mel_spec = np.dot(spec, mel_basis.T)
   mel_spec = power2db(mel_spec, top_db=top_db)
   return mel_spec
 
@@ -1705,13 +1828,14 @@ def ceps_spectrogram(mspec, n_ceps, remove_first_coef=True):
     if True remove the first coefficient of the extracted MFCCs
 
   """
+  dtype = _basis_dtype(mspec)
   if remove_first_coef:
     n_ceps = int(n_ceps) + 1
-    dct_basis = dct_filters(n_ceps, mspec.shape[1])
+    dct_basis = dct_filters(n_ceps, mspec.shape[1], dtype=dtype)
     mfcc = np.dot(dct_basis, mspec.T)[1:, :].T
   else:
     n_ceps = int(n_ceps)
-    dct_basis = dct_filters(n_ceps, mspec.shape[1])
+    dct_basis = dct_filters(n_ceps, mspec.shape[1], dtype=dtype)
     mfcc = np.dot(dct_basis, mspec.T).T
   return mfcc
 
@@ -1720,7 +1844,7 @@ def spectra(sr, frame_length, y=None, S=None,
             n_mels=None, n_ceps=None,
             fmin=64, fmax=None,
             top_db=80.0, power=2.0, log=True,
-            padding=False):
+            padding=False, dtype='float32'):
   """Compute spectra information from STFT matrix or a power spectrogram,
   The extracted spectra include:
   * log-power spectrogram
@@ -1774,6 +1898,10 @@ def spectra(sr, frame_length, y=None, S=None,
       - If `True`, the signal `y` is padded so that frame
         `D[:, t]` is centered at `y[t * step_length]`.
       - If `False`, then `D[:, t]` begins at `y[t * step_length]`
+  dtype : np.dtype
+      data type of the returned spectrogram, mel spectrogram and MFCC,
+      all computation is done in the precision of the STFT before the
+      final cast (e.g. 'float16' halves the storage of the features)
 
   Returns
   -------
@@ -1809,10 +1937,7 @@ def spectra(sr, frame_length, y=None, S=None,
     raise ValueError("fmin must < fmax, but fmin=%d and fmax=%d" %
                      (fmin, fmax))
   # ====== extract the basic spectrogram ====== #
-  if 'complex' in str(S.dtype): # get magnitude from STFT
-    spec = np.abs(S)
-  if power > 1:
-    spec = np.power(spec, power)
+  spec = power_spectrogram(S, power)
   # ====== extrct mel-filter-bands features ====== #
   if n_mels is not None or n_ceps is not None:
     mel_spec = mels_spectrogram(spec, sr, n_mels)
@@ -1825,10 +1950,12 @@ def spectra(sr, frame_length, y=None, S=None,
     spec = power2db(spec, top_db=top_db)
   # ====== return result ====== #
   results = {}
-  results['spec'] = spec.astype('float32')
+  # the features are new arrays, only copy when `spec` is still the input
+  results['spec'] = spec.astype(dtype, copy=spec is S)
   results['energy'] = log_energy
-  results['mspec'] = None if mel_spec is None else mel_spec.astype('float32')
-  results['mfcc'] = None if mfcc is None else mfcc.astype('float32')
+  results['mspec'] = None if mel_spec is None else \
+    mel_spec.astype(dtype, copy=False)
+  results['mfcc'] = None if mfcc is None else mfcc.astype(dtype, copy=False)
   return results
 
 
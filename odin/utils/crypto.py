@@ -160,18 +160,18 @@ def md5_checksum(file_or_path,
    all(isinstance(i, (np.ndarray, Number, str, bool)) for i in file_or_path)):
     if not isinstance(file_or_path, (tuple, list)):
       file_or_path = (file_or_path,)
-    # copy data
-    f = BytesIO()
     for arr in file_or_path:
-      if hasattr(arr, 'tobytes'):
-        f.write(arr.tobytes())
+      # hash the contiguous buffer directly, same bytes as `tobytes` without
+      # the intermediate copies
+      if isinstance(arr, np.ndarray) and not arr.dtype.hasobject:
+        hash_md5.update(np.ascontiguousarray(arr).reshape(-1).view(np.uint8))
+      elif hasattr(arr, 'tobytes'):
+        hash_md5.update(arr.tobytes())
       else:
+        f = BytesIO()
         np.save(file=f, arr=arr, allow_pickle=False)
-    f.seek(0)
-    # update hash
-    for chunk in iter(lambda: f.read(chunksize), b""):
-      hash_md5.update(chunk)
-    f.close()
+        hash_md5.update(f.getvalue())
+        f.close()
   # ======  path to file or folder ====== #
   elif isinstance(file_or_path, string_types):
     # TODO: sometimes the folder or file "accidently" exists
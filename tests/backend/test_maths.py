@@ -1,8 +1,6 @@
 from __future__ import absolute_import, division, print_function
 
-import os
 import unittest
-from tempfile import mkstemp
 
 import numpy as np
 
@@ -1,11 +1,8 @@
 from __future__ import absolute_import, division, print_function
 
-import os
 import unittest
 
 import numpy as np
-import tensorflow as tf
-import torch
 
 from odin import backend as bk
 from tests.backend.utils import assert_equal, x, y, z
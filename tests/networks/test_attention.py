@@ -105,6 +105,26 @@ class AttentionModelTest(unittest.TestCase):
                 except NotImplementedError as e:
                   print("no support!", e)
 
+  def test_attention_heads_unknown_length(self):
+    import tensorflow as tf
+    with bk.framework_('tf'):
+      num_heads = 3
+      heads = create_attention_heads(input_dim=dim,
+                                     num_heads=num_heads,
+                                     depth=1)
+      inputs = tf.keras.Input(shape=(None, dim))
+      outputs = heads(inputs)
+      self.assertEqual(outputs.shape.as_list(), [num_heads, None, None, dim])
+      model = tf.keras.Model(inputs, outputs)
+      for T in (Tq, Tv):
+        x = np.random.rand(n, T, dim).astype('float32')
+        y = model(x).numpy()
+        # reference: split the projection along the last axis
+        proj = heads.layers[0](x).numpy()
+        z = np.stack(np.split(proj, num_heads, axis=-1), axis=0)
+        self.assertEqual(y.shape, (num_heads, n, T, dim))
+        np.testing.assert_allclose(y, z, rtol=1e-6)
+
   def test_attention_models(self):
     with bk.framework_('tf'):
       query = bk.variable(np.random.rand(n, Tq, dim).astype('float32'),
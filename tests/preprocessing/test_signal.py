@@ -0,0 +1,126 @@
+from __future__ import absolute_import, division, print_function
+
+import unittest
+import warnings
+
+import numpy as np
+from scipy import signal as sp_signal
+
+from odin.preprocessing import signal
+
+np.random.seed(8)
+
+
+class SignalTest(unittest.TestCase):
+
+  def test_stft_integer_signal_boxcar(self):
+    rand = np.random.RandomState(8)
+    y = (rand.randn(16000) * 3000).astype('int16')
+    S, log_energy = signal.stft(y,
+                                frame_length=400,
+                                step_length=160,
+                                n_fft=512,
+                                window='boxcar',
+                                energy=True)
+    y_float = y.astype('float64')
+    S_ref, log_energy_ref = signal.stft(y_float,
+                                        frame_length=400,
+                                        step_length=160,
+                                        n_fft=512,
+                                        window='boxcar',
+                                        energy=True)
+    self.assertTrue(np.all(np.isfinite(log_energy)))
+    self.assertTrue(np.allclose(log_energy, log_energy_ref))
+    self.assertEqual(S.dtype, S_ref.dtype)
+    self.assertTrue(np.allclose(S, S_ref))
+
+  def test_delta_all_orders(self):
+
+    def delta_reference(data, width, order, axis):
+      # edge-padded lfilter chain, trimmed back to the input length
+      half_length = 1 + width // 2
+      window = np.arange(half_length - 1., -half_length, -1.)
+      window /= np.sum(np.abs(window)**2)
+      padding = [(0, 0)] * data.ndim
+      padding[axis] = (width, width)
+      delta_x = np.pad(data, padding, mode='edge')
+      idx = [slice(None)] * data.ndim
+      idx[axis] = slice(-half_length - data.shape[axis], -half_length)
+      deltas = []
+      for _ in range(order):
+        delta_x = sp_signal.lfilter(window, 1, delta_x, axis=axis)
+        deltas.append(delta_x[tuple(idx)].astype('float32'))
+      return deltas
+
+    x = np.random.RandomState(8).rand(300, 40).astype('float32')
+    for width in (3, 9):
+      for axis in (0, 1):
+        for order in (1, 2, 3):
+          deltas = signal.delta(x, width=width, order=order, axis=axis)
+          if order == 1:
+            deltas = [deltas]
+          ref = delta_reference(x, width, order, axis)
+          self.assertEqual(len(deltas), len(ref))
+          for d, r in zip(deltas, ref):
+            self.assertEqual(d.shape, x.shape)
+            self.assertEqual(d.dtype, np.float32)
+            self.assertTrue(np.allclose(d, r, atol=1e-6),
+                            msg="width=%d axis=%d order=%d" %
+                            (width, axis, order))
+
+  def test_ceps_spectrogram_dtype(self):
+    mspec = np.random.RandomState(8).rand(100, 40) * 80.
+    for dtype, out_dtype in (('float16', 'float32'), ('float32', 'float32'),
+                             ('float64', 'float64')):
+      x = mspec.astype(dtype)
+      # the bank is never half precision
+      mfcc = signal.ceps_spectrogram(x, n_ceps=13)
+      ref = signal.ceps_spectrogram(x.astype('float64'), n_ceps=13)
+      self.assertEqual(mfcc.dtype, np.dtype(out_dtype), msg=dtype)
+      self.assertTrue(np.allclose(mfcc, ref, rtol=1e-5, atol=1e-4), msg=dtype)
+
+  def test_vad_energy_matches_gaussian_mixture(self):
+    from sklearn.mixture import GaussianMixture
+
+    def vad_reference(log_energy, distrib_nb, nb_train_it):
+      # the sklearn mixture model previously fitted by `vad_energy`
+      log_energy = (log_energy - np.mean(log_energy)) / np.std(log_energy)
+      log_energy = log_energy.reshape(-1, 1)
+      world = GaussianMixture(
+          n_components=distrib_nb,
+          covariance_type='diag',
+          init_params='kmeans',
+          max_iter=nb_train_it,
+          weights_init=np.ones(distrib_nb) / distrib_nb,
+          means_init=(-2 + 4.0 * np.arange(distrib_nb) /
+                      (distrib_nb - 1))[:, np.newaxis],
+          precisions_init=np.ones((distrib_nb, 1)))
+      with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        world.fit(log_energy)
+      threshold = world.means_.max() - signal.VAD_MODE_STANDARD * \
+        np.sqrt(1.0 / world.precisions_[world.means_.argmax(), 0])
+      return log_energy.ravel() > threshold, threshold
+
+    rand = np.random.RandomState(8)
+    # silence with bursts of louder "speech"
+    y = rand.randn(16000 * 5) * 0.01
+    for start in range(4000, len(y), 16000):
+      y[start:start + 6000] += rand.randn(6000)
+    frames = signal.segment_axis(y, 400, 160)
+    log_energy = signal.get_energy(frames, log=True).ravel()
+    for distrib_nb in (2, 3):
+      for nb_train_it in (24, 33):
+        label, threshold = signal.vad_energy(log_energy,
+                                             distrib_nb=distrib_nb,
+                                             nb_train_it=nb_train_it)
+        label_ref, threshold_ref = vad_reference(log_energy, distrib_nb,
+                                                 nb_train_it)
+        self.assertTrue(np.isclose(threshold, threshold_ref, rtol=1e-6),
+                        msg="%d components" % distrib_nb)
+        self.assertTrue(np.array_equal(label, label_ref),
+                        msg="%d components" % distrib_nb)
+
+
+if __name__ == '__main__':
+  unittest.main()